@@ -1,4 +1,5 @@
 import os
+import threading
 from dotenv import load_dotenv
 import joblib
 import pandas as pd
@@ -14,6 +15,8 @@ kmeans = joblib.load(os.path.join(BASE_DIR, 'kmeans_model.pkl'))
 cluster_risk = joblib.load(os.path.join(BASE_DIR, 'cluster_risk_lookup.pkl'))
 scaler = joblib.load(os.path.join(BASE_DIR, 'risk_scaler.pkl'))
 HIGH_RISK_THRESH = 0.53
+# Route plans score in worker threads; only model inference is serialized
+kmeans_lock = threading.Lock()
 
 df = pd.read_csv(os.path.join(BASE_DIR,'cleaned_crime_data_pruned_with_clusters.csv'))
 
@@ -30,14 +33,15 @@ def geocode_addr(addr):
     else:
         raise ValueError(f"Could not geocode address: {addr}")
 
-def fetch_routes(src_addr, dst_addr):
+def fetch_routes(src_addr, dst_addr, mode="driving"):
     """
     Fetch alternative routes between src and dst using Google Maps Directions API.
+    src/dst may be addresses or already geocoded (lat, lng) tuples.
     Returns a list of dicts: {polyline, distance_km, duration_min}
     """
-    src = geocode_addr(src_addr)
-    dst = geocode_addr(dst_addr)
-    directions = gmaps.directions(src, dst, alternatives=True, mode="driving")
+    src = geocode_addr(src_addr) if isinstance(src_addr, str) else src_addr
+    dst = geocode_addr(dst_addr) if isinstance(dst_addr, str) else dst_addr
+    directions = gmaps.directions(src, dst, alternatives=True, mode=mode)
     routes = []
     for leg in directions:
         routes.append({
@@ -47,22 +51,16 @@ def fetch_routes(src_addr, dst_addr):
         })
     return routes
 
-def get_route_crime_score(points):
+def get_point_risks(points):
     """
-    For a list of (lat, lng) points, compute the average risk score and collect hotspots.
-    Returns (mean_risk, hotspots_list)
+    Predict the cluster and risk for many (lat, lng) points in one batched call.
+    Returns a list of (risk, cid) tuples in the same order as points.
     """
-    risks = []
-    hotspots = []
-    for lat, lng in points:
-        cid = kmeans.predict(pd.DataFrame([[lat, lng]], columns=['latitude', 'longitude']))[0]
-        risk = cluster_risk.get(cid, 0)
-        risks.append(risk)
-        if risk > HIGH_RISK_THRESH:
-            # Optionally enrich with top crimes here if needed
-            hotspots.append({"lat": lat, "lng": lng, "risk": float(risk), "cid": int(cid), "top_crimes": []})
-    mean_risk = float(np.mean(risks)) if risks else 0.0
-    return mean_risk, hotspots
+    if not points:
+        return []
+    with kmeans_lock:
+        cids = kmeans.predict(pd.DataFrame(list(points), columns=['latitude', 'longitude']))
+    return [(float(cluster_risk.get(cid, 0)), int(cid)) for cid in cids]
 
 def sample_polyline(encoded, step_m=200):
     return polyline.decode(encoded)
@@ -0,0 +1,253 @@
+"""
+Local stand-ins for the external services SafeNav talks to (Google Maps,
+Street View, Twilio, RapidAPI and MongoDB), each with configurable latency.
+
+Synchronous fakes block with time.sleep, exactly like the real SDK calls do
+inside the async route handlers, so event-loop stalls show up the same way
+they would in production. The MongoDB fake is async like motor.
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import os
+import time
+from io import BytesIO
+from types import SimpleNamespace
+
+import polyline
+from bson import ObjectId
+
+DEFAULT_CENTER = (41.8781, -87.6298)  # Chicago, where the crime model was trained
+
+class Latency:
+    """Per-service simulated latency in seconds."""
+    def __init__(self, gmaps=0.05, streetview=0.02, twilio=0.1, rapidapi=0.15, mongo=0.002):
+        self.gmaps = gmaps
+        self.streetview = streetview
+        self.twilio = twilio
+        self.rapidapi = rapidapi
+        self.mongo = mongo
+
+LATENCY = Latency()
+
+# ---------------------------------------------------------------- Google Maps
+
+class FakeGoogleMaps:
+    """Replacement for googlemaps.Client returning deterministic Chicago data."""
+    def __init__(self, key=None, **kwargs):
+        pass
+
+    def geocode(self, addr):
+        time.sleep(LATENCY.gmaps)
+        digest = hashlib.md5(str(addr).encode()).digest()
+        lat = DEFAULT_CENTER[0] + (digest[0] / 255.0 - 0.5) * 0.2
+        lng = DEFAULT_CENTER[1] + (digest[1] / 255.0 - 0.5) * 0.2
+        return [{"geometry": {"location": {"lat": lat, "lng": lng}}}]
+
+    def directions(self, src, dst, alternatives=False, mode="driving", **kwargs):
+        time.sleep(LATENCY.gmaps)
+        src = self._as_point(src)
+        dst = self._as_point(dst)
+        offsets = [0.0, 0.01, -0.01] if alternatives else [0.0]
+        routes = []
+        for offset in offsets:
+            points = []
+            for i in range(60):
+                t = i / 59
+                bulge = math.sin(math.pi * t) * offset
+                points.append((
+                    src[0] + (dst[0] - src[0]) * t + bulge,
+                    src[1] + (dst[1] - src[1]) * t - bulge,
+                ))
+            distance_m = 111_000 * math.hypot(dst[0] - src[0], dst[1] - src[1]) * (1 + abs(offset) * 10)
+            routes.append({
+                "overview_polyline": {"points": polyline.encode(points)},
+                "legs": [{
+                    "distance": {"value": distance_m},
+                    "duration": {"value": distance_m / 8.0},
+                }],
+            })
+        return routes
+
+    def _as_point(self, value):
+        if isinstance(value, str):
+            loc = self.geocode(value)[0]["geometry"]["location"]
+            return (loc["lat"], loc["lng"])
+        return tuple(value)
+
+# ---------------------------------------------------------------- Street View
+
+_streetview_image = None
+
+def _streetview_bytes():
+    global _streetview_image
+    if _streetview_image is None:
+        from PIL import Image
+        buf = BytesIO()
+        Image.new("RGB", (640, 640), (40, 40, 60)).save(buf, format="JPEG")
+        _streetview_image = buf.getvalue()
+    return _streetview_image
+
+class FakeStreetViewRequests:
+    """Stands in for the `requests` module used by streetlight_model.street."""
+    def get(self, url, **kwargs):
+        time.sleep(LATENCY.streetview)
+        return SimpleNamespace(status_code=200, content=_streetview_bytes())
+
+# ---------------------------------------------------------------- Twilio
+
+class FakeTwilioClient:
+    def __init__(self, account_sid=None, auth_token=None, **kwargs):
+        self.messages = self
+
+    def create(self, body=None, from_=None, to=None, **kwargs):
+        time.sleep(LATENCY.twilio)
+        return SimpleNamespace(sid=f"SM{ObjectId()}", body=body, to=to)
+
+# ---------------------------------------------------------------- RapidAPI
+
+class FakeHTTPSConnection:
+    """Replacement for http.client.HTTPSConnection used by the crime reports proxy."""
+    def __init__(self, host, *args, **kwargs):
+        self.host = host
+        self._payload = {}
+
+    def request(self, method, url, body=None, headers=None):
+        time.sleep(LATENCY.rapidapi)
+        self._payload = json.loads(body) if body else {}
+
+    def getresponse(self):
+        data = json.dumps({
+            "success": True,
+            "location": self._payload,
+            "crimes": [
+                {"type": "THEFT", "date": "2024-01-01", "count": 12},
+                {"type": "BATTERY", "date": "2024-01-01", "count": 4},
+            ],
+        }).encode("utf-8")
+        return SimpleNamespace(status=200, read=lambda: data)
+
+FakeHttp = SimpleNamespace(client=SimpleNamespace(HTTPSConnection=FakeHTTPSConnection))
+
+# ---------------------------------------------------------------- MongoDB
+
+def _matches(doc, query):
+    return all(doc.get(k) == v for k, v in query.items())
+
+class FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, key, direction=1):
+        self._docs = sorted(self._docs, key=lambda d: d.get(key), reverse=direction < 0)
+        return self
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(LATENCY.mongo)
+        return list(itertools.islice(self._docs, length))
+
+class FakeCollection:
+    """In-memory subset of motor's AsyncIOMotorCollection used by the routers."""
+    def __init__(self):
+        self.docs = []
+
+    async def find_one(self, query):
+        await asyncio.sleep(LATENCY.mongo)
+        for doc in self.docs:
+            if _matches(doc, query):
+                return dict(doc)
+        return None
+
+    def find(self, query=None):
+        query = query or {}
+        return FakeCursor([dict(d) for d in self.docs if _matches(d, query)])
+
+    async def insert_one(self, doc):
+        await asyncio.sleep(LATENCY.mongo)
+        doc.setdefault("_id", ObjectId())
+        self.docs.append(doc)
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def update_one(self, query, update):
+        await asyncio.sleep(LATENCY.mongo)
+        for doc in self.docs:
+            if _matches(doc, query):
+                doc.update(update.get("$set", {}))
+                return SimpleNamespace(matched_count=1, modified_count=1)
+        return SimpleNamespace(matched_count=0, modified_count=0)
+
+    async def delete_one(self, query):
+        await asyncio.sleep(LATENCY.mongo)
+        for i, doc in enumerate(self.docs):
+            if _matches(doc, query):
+                del self.docs[i]
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+class FakeSyncCollection:
+    """Blocking collection used by route scoring for community incident reports."""
+    def __init__(self):
+        self.docs = []
+
+    def find(self, query=None, projection=None, **kwargs):
+        # No reports are seeded, so every corridor is empty
+        time.sleep(LATENCY.mongo)
+        return iter(list(self.docs))
+
+# ---------------------------------------------------------------- route cache
+
+class NullCacheBackend:
+    """Route cache backend that never stores, so every plan is a MISS."""
+    async def get(self, key):
+        return None
+
+    async def set(self, key, entry, ttl):
+        pass
+
+# ---------------------------------------------------------------- wiring
+
+def install_fakes(route_cache=True):
+    """
+    Patch every external dependency with its local fake and return the
+    FastAPI app together with the fake MongoDB collections. googlemaps.Client
+    must be replaced before the model modules are imported because they
+    build their clients at import time.
+
+    The route cache is always process-local (never the shared Redis backend);
+    with route_cache=False nothing is cached, so `plan` measures the full
+    plan_route pipeline on every request.
+    """
+    import googlemaps
+    googlemaps.Client = FakeGoogleMaps
+    # Keep the route cache module from building a Redis client at import
+    os.environ.pop("ROUTE_CACHE_REDIS_URL", None)
+
+    from main import app
+    from crime_model import crime
+    from streetlight_model import street
+    from routers import auth, contacts, sos, crime_reports
+    from routers import route
+    from services import database, incidents
+    from services.route_cache import RouteCache, LRUBackend, ROUTE_CACHE_SIZE
+
+    crime.gmaps = FakeGoogleMaps()
+    street.gmaps = FakeGoogleMaps()
+    street.requests = FakeStreetViewRequests()
+    sos.Client = FakeTwilioClient
+    crime_reports.http = FakeHttp
+    incidents.sync_incidents_collection = FakeSyncCollection()
+    route.route_cache = RouteCache(LRUBackend(ROUTE_CACHE_SIZE) if route_cache else NullCacheBackend())
+
+    collections = {
+        "users_collection": FakeCollection(),
+        "contacts_collection": FakeCollection(),
+        "sos_collection": FakeCollection(),
+        "incidents_collection": FakeCollection(),
+    }
+    for module in (database, auth, contacts, sos):
+        for name, collection in collections.items():
+            if hasattr(module, name):
+                setattr(module, name, collection)
+    return app, collections
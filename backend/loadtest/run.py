@@ -0,0 +1,192 @@
+"""
+Self-contained load generator for the SafeNav backend.
+
+The app runs in-process (ASGI transport, no network) with every external
+service replaced by the fakes in loadtest/fakes.py. Virtual users pick
+endpoints according to a weighted mix, and a monitor task measures how late
+the event loop wakes up, so blocking work inside one handler (e.g. the
+synchronous model inference in plan_route) shows up as stalls and as
+latency on unrelated endpoints such as SOS.
+
+Usage (from backend/):
+    python -m loadtest.run --users 20 --duration 30 \
+        --mix login=1,plan=1,sos=1,contacts=5,crime_reports=2 \
+        --gmaps-latency 0.05 --mongo-latency 0.002 --no-route-cache
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+
+import httpx
+import numpy as np
+
+from loadtest import fakes
+
+ENDPOINTS = {
+    "login": ("POST", "/auth/login"),
+    "plan": ("POST", "/route/plan"),
+    "sos": ("POST", "/sos/trigger"),
+    "contacts": ("GET", "/contacts/list"),
+    "crime_reports": ("POST", "/external/crime_reports"),
+}
+
+DEFAULT_MIX = "login=1,plan=1,sos=1,contacts=5,crime_reports=2"
+TEST_PASSWORD = "loadtest-password"
+
+def parse_mix(mix):
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+async def seed_users(collections, count):
+    from utils.auth import hash_password, create_access_token
+    hashed = hash_password(TEST_PASSWORD)
+    users = []
+    for i in range(count):
+        email = f"user{i}@example.com"
+        await collections["users_collection"].insert_one({
+            "email": email,
+            "full_name": f"Load Test {i}",
+            "phone_number": "+15550000000",
+            "address": "Chicago",
+            "hashed_password": hashed,
+        })
+        await collections["contacts_collection"].insert_one({
+            "user_email": email,
+            "name": "Contact",
+            "phone_number": "+15550000001",
+            "relationship": "Friend",
+        })
+        users.append((email, create_access_token({"sub": email})))
+    return users
+
+def build_request(name, email, token, rng):
+    headers = {"Authorization": f"Bearer {token}"}
+    lat = fakes.DEFAULT_CENTER[0] + rng.uniform(-0.05, 0.05)
+    lng = fakes.DEFAULT_CENTER[1] + rng.uniform(-0.05, 0.05)
+    if name == "login":
+        return {"json": {"email": email, "password": TEST_PASSWORD}}
+    if name == "plan":
+        return {"headers": headers, "json": {"start": f"Origin {rng.randint(0, 50)}", "end": f"Destination {rng.randint(0, 50)}"}}
+    if name == "sos":
+        return {"headers": headers, "json": {"location": {"lat": lat, "lng": lng}, "routeDetails": {"destination": "Home", "eta": "12 mins"}}}
+    if name == "contacts":
+        return {"headers": headers}
+    return {"params": {"lat": lat, "lon": lng}}
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.stalls = []
+
+    def report(self, elapsed, stall_threshold):
+        lines = [f"{'endpoint':<15}{'count':>8}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+        for name in ENDPOINTS:
+            samples = self.latencies.get(name)
+            if not samples and not self.errors.get(name):
+                continue
+            count = len(samples or [])
+            if samples:
+                percentiles = "".join(f"{p:>10.1f}" for p in np.percentile(np.array(samples) * 1000, [50, 95, 99]))
+            else:
+                percentiles = f"{'n/a':>10}" * 3
+            lines.append(
+                f"{name:<15}{count:>8}{self.errors[name]:>8}{count / elapsed:>9.1f}{percentiles}"
+            )
+        total = sum(len(v) for v in self.latencies.values())
+        lines.append(f"total throughput: {total / elapsed:.1f} req/s over {elapsed:.1f}s")
+        if self.stalls:
+            lines.append(
+                f"event-loop stalls > {stall_threshold * 1000:.0f} ms: {len(self.stalls)} "
+                f"(max {max(self.stalls) * 1000:.0f} ms, total {sum(self.stalls):.2f}s blocked)"
+            )
+        else:
+            lines.append(f"no event-loop stalls > {stall_threshold * 1000:.0f} ms")
+        return "\n".join(lines)
+
+async def monitor_loop(stats, stop, interval, threshold):
+    """Sleep in short ticks and record how much later than requested we woke up."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = time.perf_counter() - start - interval
+        if lag > threshold:
+            stats.stalls.append(lag)
+
+async def virtual_user(client, users, weights, stats, deadline, seed):
+    rng = random.Random(seed)
+    names = list(weights)
+    weight_values = list(weights.values())
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights=weight_values)[0]
+        method, path = ENDPOINTS[name]
+        email, token = rng.choice(users)
+        start = time.perf_counter()
+        try:
+            resp = await client.request(method, path, **build_request(name, email, token, rng))
+            ok = resp.status_code < 400
+        except Exception:
+            ok = False
+        if ok:
+            stats.latencies[name].append(time.perf_counter() - start)
+        else:
+            stats.errors[name] += 1
+
+async def run(args):
+    fakes.LATENCY = fakes.Latency(
+        gmaps=args.gmaps_latency,
+        streetview=args.streetview_latency,
+        twilio=args.twilio_latency,
+        rapidapi=args.rapidapi_latency,
+        mongo=args.mongo_latency,
+    )
+    app, collections = fakes.install_fakes(route_cache=not args.no_route_cache)
+    users = await seed_users(collections, args.accounts)
+    weights = parse_mix(args.mix)
+
+    stats = Stats()
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        monitor = asyncio.create_task(monitor_loop(stats, stop, args.monitor_interval, args.stall_threshold))
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*[
+            virtual_user(client, users, weights, stats, deadline, seed=i)
+            for i in range(args.users)
+        ])
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await monitor
+    print(stats.report(elapsed, args.stall_threshold))
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test SafeNav against local fakes of all external services")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="Test duration in seconds")
+    parser.add_argument("--accounts", type=int, default=20, help="Seeded user accounts")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted endpoint mix, e.g. plan=1,sos=1")
+    parser.add_argument(
+        "--no-route-cache", action="store_true",
+        help="Bypass the route-plan cache so every plan runs the full scoring pipeline"
+    )
+    parser.add_argument("--gmaps-latency", type=float, default=0.05)
+    parser.add_argument("--streetview-latency", type=float, default=0.02)
+    parser.add_argument("--twilio-latency", type=float, default=0.1)
+    parser.add_argument("--rapidapi-latency", type=float, default=0.15)
+    parser.add_argument("--mongo-latency", type=float, default=0.002)
+    parser.add_argument("--monitor-interval", type=float, default=0.01)
+    parser.add_argument("--stall-threshold", type=float, default=0.05, help="Loop lag in seconds counted as a stall")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
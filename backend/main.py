@@ -1,8 +1,23 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import auth,contacts,sos, route, crime_reports
+from routers import auth,contacts,sos, route, crime_reports, risk, incidents
+from services.database import ensure_indexes
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await asyncio.wait_for(ensure_indexes(), timeout=5)
+    except Exception:
+        # Serve anyway; incident scoring degrades until Mongo is reachable
+        logger.warning("could not create incident indexes", exc_info=True)
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,4 +32,6 @@ app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(contacts.router, prefix="/contacts", tags=["Contacts"])
 app.include_router(sos.router, prefix="/sos", tags=["SOS"])
 app.include_router(route.router, prefix="/route", tags=["Route"])
-app.include_router(crime_reports.router, prefix="/external", tags=["External Services"])
\ No newline at end of file
+app.include_router(crime_reports.router, prefix="/external", tags=["External Services"])
+app.include_router(risk.router, prefix="/risk", tags=["Risk"])
+app.include_router(incidents.router, prefix="/incidents", tags=["Incidents"])
\ No newline at end of file
@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class IncidentReport(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+    category: str = Field(..., min_length=3, max_length=50)
+    description: str = Field("", max_length=500)
+    severity: int = Field(3, ge=1, le=5)
+    expires_in_days: Optional[int] = Field(None, ge=1, le=365)
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Body, Depends, HTTPException
+from typing import List
+from datetime import datetime, timedelta
+from pymongo.errors import BulkWriteError
+from models.incidents import IncidentReport
+from services.database import incidents_collection
+from services.incidents import (
+    incident_document, INCIDENT_BATCH_SIZE, INCIDENT_BULK_MAX,
+    INCIDENT_DAILY_LIMIT, INCIDENT_DEDUP_RADIUS_M,
+)
+from utils.auth import get_current_user, get_admin_user
+
+router = APIRouter()
+
+@router.post("/report", status_code=201)
+async def report_incident(report: IncidentReport, current_user: dict = Depends(get_current_user)):
+    # Reports feed everyone's route scores, so limit what one account can add
+    user_email = current_user["email"]
+    since = datetime.utcnow() - timedelta(days=1)
+    recent = await incidents_collection.count_documents(
+        {"user_email": user_email, "source": "user", "created_at": {"$gte": since}}
+    )
+    if recent >= INCIDENT_DAILY_LIMIT:
+        raise HTTPException(status_code=429, detail="Daily incident report limit reached")
+
+    duplicate = await incidents_collection.find_one({
+        "user_email": user_email,
+        "category": report.category,
+        "created_at": {"$gte": since},
+        "location": {"$nearSphere": {
+            "$geometry": {"type": "Point", "coordinates": [report.lng, report.lat]},
+            "$maxDistance": INCIDENT_DEDUP_RADIUS_M,
+        }},
+    })
+    if duplicate:
+        raise HTTPException(status_code=409, detail="You already reported this incident nearby")
+
+    result = await incidents_collection.insert_one(incident_document(report, user_email))
+    if not result.inserted_id:
+        raise HTTPException(status_code=500, detail="Failed to save incident report")
+    return {"message": "Incident reported", "incident_id": str(result.inserted_id)}
+
+@router.post("/bulk", status_code=201)
+async def bulk_ingest(
+    reports: List[IncidentReport] = Body(..., max_length=INCIDENT_BULK_MAX),
+    current_user: dict = Depends(get_admin_user)
+):
+    inserted = 0
+    failed = 0
+    for i in range(0, len(reports), INCIDENT_BATCH_SIZE):
+        batch = [incident_document(r, current_user["email"], source="bulk") for r in reports[i:i + INCIDENT_BATCH_SIZE]]
+        try:
+            result = await incidents_collection.insert_many(batch, ordered=False)
+            inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            inserted += e.details.get("nInserted", 0)
+            failed += len(e.details.get("writeErrors", []))
+    return {"message": "Incidents ingested", "inserted": inserted, "failed": failed}
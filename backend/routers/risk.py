@@ -0,0 +1,30 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from services.risk_tiles import get_tile, tile_etag, MAX_ZOOM
+
+router = APIRouter()
+
+TILE_CACHE_CONTROL = "public, max-age=86400, stale-while-revalidate=604800"
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison against an If-None-Match list, as required for GET."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    def opaque(tag):
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+    return any(opaque(tag) == opaque(etag) for tag in if_none_match.split(","))
+
+@router.get("/tiles/{z}/{x}/{y}.png")
+@router.get("/tiles/{z}/{x}/{y}")
+def risk_tile(z: int, x: int, y: int, request: Request):
+    # Sync handler: rendering is CPU bound, so FastAPI runs it in the threadpool
+    if z < 0 or z > MAX_ZOOM or not (0 <= x < 2 ** z) or not (0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+
+    etag = tile_etag(z, x, y)
+    headers = {"ETag": etag, "Cache-Control": TILE_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=get_tile(z, x, y), media_type="image/png", headers=headers)
@@ -1,16 +1,24 @@
-from fastapi import APIRouter, Depends
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
-from typing import List
+from typing import List, Literal, Union
 import polyline
 from utils.auth import get_current_user
-from crime_model.crime import fetch_routes, get_route_crime_score
-from streetlight_model.street import get_lighting_score_for_points
+from utils.route_format import coalesce_hotspots, simplify_polyline, negotiated_response
+from services.route_cache import route_cache, route_cache_key
+from services.incidents import get_incident_scores, combine_risk
+from crime_model.crime import geocode_addr, fetch_routes, get_point_risks, HIGH_RISK_THRESH
+from streetlight_model.street import is_point_well_lit
 
 router = APIRouter()
 
+# Grid (in degrees, ~50 m) used to treat sampled points of different routes as the same place
+SCORING_GRID_DEG = 0.0005
+
 class RouteRequest(BaseModel):
     start: str
     end: str
+    mode: Literal["driving", "walking", "bicycling", "transit"] = "driving"
 
 class Hotspot(BaseModel):
     lat: float
@@ -33,6 +41,24 @@ class RouteOption(BaseModel):
     hotspots: List[Hotspot]
     polyline: str
 
+class HotspotSpan(BaseModel):
+    cid: int
+    risk: float
+    start: List[float]
+    end: List[float]
+    n: int
+
+class CompactRouteOption(BaseModel):
+    id: int
+    distance_km: float
+    duration_min: float
+    safety: float
+    lit: float
+    crime: float
+    level: str
+    spans: List[HotspotSpan]
+    polyline: str
+
 def sample_polyline(encoded, num_points=5):
     """
     Decodes a polyline and samples up to num_points evenly along the route.
@@ -43,21 +69,117 @@ def sample_polyline(encoded, num_points=5):
     step = max(1, len(coords) // num_points)
     return coords[::step]
 
-@router.post("/plan", response_model=List[RouteOption])
-async def plan_route(req: RouteRequest, current_user: dict = Depends(get_current_user)):
+def snap_point(point):
+    lat, lng = point
+    return (round(lat / SCORING_GRID_DEG), round(lng / SCORING_GRID_DEG))
+
+def aggregate_crime(keys, unique_points, crime_by_key):
+    """
+    Mean risk and hotspots for one route from the per-point crime scores.
+    Scores come from the shared per-point results, nothing is predicted again.
+    """
+    risks = []
+    hotspots = []
+    for idx, key in enumerate(keys):
+        risk, cid, base_risk = crime_by_key[key]
+        risks.append(risk)
+        # Hotspots follow the cluster model; reports only raise the risk value
+        if base_risk > HIGH_RISK_THRESH:
+            lat, lng = unique_points[key]
+            hotspots.append({"lat": lat, "lng": lng, "risk": risk, "cid": cid, "top_crimes": [], "idx": idx})
+    mean_risk = sum(risks) / len(risks) if risks else 0.0
+    return mean_risk, hotspots
+
+@router.post(
+    "/plan",
+    response_model=Union[List[RouteOption], List[CompactRouteOption]],
+    responses={200: {
+        "description": "List[RouteOption] by default; List[CompactRouteOption] with format=compact, "
+                       "as JSON or, when accepted, MessagePack (gzip/brotli per Accept-Encoding)",
+        "content": {"application/msgpack": {"schema": {
+            "type": "array", "items": {"$ref": "#/components/schemas/CompactRouteOption"},
+        }}},
+    }},
+)
+async def plan_route(
+    req: RouteRequest,
+    request: Request,
+    response: Response,
+    format: str = Query("full", pattern="^(full|compact)$"),
+    tolerance: float = Query(
+        0.0, ge=0,
+        description="Polyline simplification tolerance in meters; only valid with format=compact"
+    ),
+    current_user: dict = Depends(get_current_user)
+):
+    if tolerance and format != "compact":
+        raise HTTPException(status_code=400, detail="tolerance is only supported with format=compact")
+
+    # Blocking Google Maps calls, kept off the event loop even on cache hits
+    src, dst = await asyncio.gather(
+        asyncio.to_thread(geocode_addr, req.start),
+        asyncio.to_thread(geocode_addr, req.end),
+    )
+    key = route_cache_key(src, dst, req.mode)
+    plan, age, status = await route_cache.get_or_compute(
+        key, lambda: compute_route_plan(src, dst, req.mode)
+    )
+    route_results = plan['routes']
+    cache_headers = {
+        "Age": str(int(age)),
+        "X-Cache": status,
+        # Sampled points per uniquely scored point when the plan was computed
+        "X-Dedup-Ratio": f"{plan['dedup_ratio']:.2f}",
+    }
+
+    if format == "compact":
+        compact = negotiated_response([to_compact(r, tolerance) for r in route_results], request)
+        compact.headers.update(cache_headers)
+        return compact
+    response.headers.update(cache_headers)
+    return [to_full(r) for r in route_results]
+
+def compute_route_plan(src, dst, mode="driving"):
+    """
+    Full scoring pipeline for a geocoded origin/destination pair. Returns the
+    unformatted route results sorted by safety rating together with the
+    point dedup ratio; this is what the route cache stores, and
+    to_full/to_compact render it per request.
+    """
     # 1. Fetch all available routes
-    routes = fetch_routes(req.start, req.end)  # returns list of dicts with polyline, distance, eta
+    routes = fetch_routes(src, dst, mode)  # returns list of dicts with polyline, distance, eta
 
-    route_results = []
-    for idx, route in enumerate(routes):
-        # 2. Sample points along the route
-        points = sample_polyline(route['polyline'])  # list of (lat, lng)
+    # 2. Sample points along every route and snap them to shared keys, so
+    # stretches common to several alternatives are scored only once
+    route_keys = []
+    unique_points = {}
+    for route in routes:
+        keys = []
+        for point in sample_polyline(route['polyline']):  # list of (lat, lng)
+            key = snap_point(point)
+            unique_points.setdefault(key, point)
+            keys.append(key)
+        route_keys.append(keys)
 
-        # 3. Crime score for route
-        crime_score, hotspots = get_route_crime_score(points)
+    # 3. Crime (cluster risk raised by nearby community incident reports) and
+    # streetlight scores for each unique point
+    point_keys = list(unique_points)
+    point_list = [unique_points[k] for k in point_keys]
+    incident_by_key = get_incident_scores([r['polyline'] for r in routes], route_keys, unique_points)
+    crime_by_key = {
+        k: (combine_risk(risk, incident_by_key.get(k, 0.0)), cid, risk)
+        for k, (risk, cid) in zip(point_keys, get_point_risks(point_list))
+    }
+    lit_by_key = {k: is_point_well_lit(*unique_points[k]) for k in point_keys}
 
-        # 4. Streetlight score for route
-        lighting_score = get_lighting_score_for_points(points)
+    sampled = sum(len(keys) for keys in route_keys)
+    dedup_ratio = sampled / len(point_keys) if point_keys else 1.0
+
+    route_results = []
+    for idx, (route, keys) in enumerate(zip(routes, route_keys)):
+        # 4. Map point scores back to the route's aggregates
+        crime_score, hotspots = aggregate_crime(keys, unique_points, crime_by_key)
+        lighting_score = sum(lit_by_key[k] for k in keys) / len(keys) if keys else 0.0
 
         # 5. Combine scores (custom logic)
         # Example: Higher lighting_score and lower crime_score = safer
@@ -65,24 +187,21 @@ async def plan_route(req: RouteRequest, current_user: dict = Depends(get_current
 
         route_results.append({
             "id": idx + 1,
-            "name": f"Route {idx+1}",
-            "distance": f"{route['distance_km']:.2f} km",
-            "estimatedTime": f"{route['duration_min']:.1f} mins",
-            "safetyRating": round(combined_score * 5, 1),
-            "wellLit": f"{int(lighting_score * 100)}%",
-            "crimeRisk": crime_score,
-            "lightingScore": lighting_score,
-            "risk_level": None,  
-            "overall_risk": crime_score,
+            "distance_km": route['distance_km'],
+            "duration_min": route['duration_min'],
+            "safety_rating": round(combined_score * 5, 1),
+            "crime_risk": crime_score,
+            "lighting_score": lighting_score,
+            "risk_level": None,
             "hotspots": hotspots,
-            "polyline": route['polyline']
+            "polyline": route['polyline'],
         })
 
     # 6. Label routes as Low/Medium/High risk based on combined_score
-    scores = [r['safetyRating'] for r in route_results]
+    scores = [r['safety_rating'] for r in route_results]
     min_score, max_score = min(scores), max(scores)
     for r in route_results:
-        norm = (r['safetyRating'] - min_score) / (max_score - min_score + 1e-6)
+        norm = (r['safety_rating'] - min_score) / (max_score - min_score + 1e-6)
         if norm > 0.66:
             r['risk_level'] = "Low"
         elif norm > 0.33:
@@ -91,5 +210,40 @@ async def plan_route(req: RouteRequest, current_user: dict = Depends(get_current
             r['risk_level'] = "High"
 
     # 7. Sort and return
-    route_results.sort(key=lambda r: -r['safetyRating'])
-    return route_results
\ No newline at end of file
+    route_results.sort(key=lambda r: -r['safety_rating'])
+    return {"routes": route_results, "dedup_ratio": dedup_ratio}
+
+def to_full(r):
+    """Default response form of a route result, with display-formatted strings."""
+    return {
+        "id": r['id'],
+        "name": f"Route {r['id']}",
+        "distance": f"{r['distance_km']:.2f} km",
+        "estimatedTime": f"{r['duration_min']:.1f} mins",
+        "safetyRating": r['safety_rating'],
+        "wellLit": f"{int(r['lighting_score'] * 100)}%",
+        "crimeRisk": r['crime_risk'],
+        "lightingScore": r['lighting_score'],
+        "risk_level": r['risk_level'],
+        "overall_risk": r['crime_risk'],
+        "hotspots": r['hotspots'],
+        "polyline": r['polyline'],
+    }
+
+def to_compact(r, tolerance):
+    """
+    Compact form of a route result: numeric fields instead of formatted
+    strings, hotspots coalesced into per-cluster spans and an optionally
+    simplified polyline.
+    """
+    return CompactRouteOption(
+        id=r['id'],
+        distance_km=round(r['distance_km'], 3),
+        duration_min=round(r['duration_min'], 1),
+        safety=r['safety_rating'],
+        lit=round(r['lighting_score'], 3),
+        crime=round(r['crime_risk'], 4),
+        level=r['risk_level'],
+        spans=coalesce_hotspots(r['hotspots']),
+        polyline=simplify_polyline(r['polyline'], tolerance),
+    ).model_dump()
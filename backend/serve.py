@@ -0,0 +1,91 @@
+"""
+Multi-worker launcher for the SafeNav backend.
+
+Running `uvicorn main:app --workers N` makes every worker import the crime
+model (sklearn + the crime CSV) and the YOLO streetlight model on its own, so
+memory grows linearly with N. This launcher imports the app once in the master
+(which loads all read-only model artifacts), freezes those objects out of the
+garbage collector and then forks the workers. The model pages stay shared
+copy-on-write between workers instead of being duplicated.
+
+Usage:
+    python serve.py --workers 4 --port 8000 --memory-report-interval 60
+"""
+import argparse
+import gc
+import os
+import threading
+import time
+
+from gunicorn.app.base import BaseApplication
+
+from utils.memory import format_memory_report
+
+class PreloadedApplication(BaseApplication):
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        # Imported here so it happens in the master when preload_app is set
+        from main import app
+        return app
+
+def make_when_ready(report_interval):
+    def when_ready(server):
+        # GC has been disabled since before the app was loaded, so there are no
+        # freed holes in the model pages. Freeze everything loaded so far into
+        # the permanent generation so GC passes in the workers never write to
+        # those object headers and un-share the pages. Frozen objects are not
+        # scanned, so the master can collect its own garbage again right away.
+        gc.freeze()
+        gc.enable()
+        server.log.info("Models preloaded in master %s, %d objects frozen", os.getpid(), gc.get_freeze_count())
+
+        if report_interval > 0:
+            def report():
+                while True:
+                    time.sleep(report_interval)
+                    # Snapshot, the arbiter mutates WORKERS while (re)spawning
+                    worker_pids = list(server.WORKERS.copy().keys())
+                    server.log.info("Memory report:\n%s", format_memory_report(server.pid, worker_pids))
+            threading.Thread(target=report, daemon=True).start()
+    return when_ready
+
+def post_worker_init(worker):
+    gc.enable()
+    worker.log.info("Worker %s started from preloaded master", worker.pid)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run SafeNav with models preloaded before forking workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", 2)))
+    parser.add_argument("--timeout", type=int, default=120)
+    parser.add_argument(
+        "--memory-report-interval", type=int, default=0,
+        help="Log per-worker unique vs shared memory every N seconds (0 disables)"
+    )
+    args = parser.parse_args()
+
+    # Keep GC off while the models load; when_ready re-enables it after freezing
+    gc.disable()
+
+    options = {
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "timeout": args.timeout,
+        "when_ready": make_when_ready(args.memory_report_interval),
+        "post_worker_init": post_worker_init,
+    }
+    PreloadedApplication(options).run()
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient, ASCENDING, GEOSPHERE
 from pymongo.collection import Collection
 
 MONGO_URI = "mongodb://localhost:27017/safenav"
@@ -10,4 +11,17 @@ db = client[DATABASE_NAME]
 # Collections
 users_collection: Collection = db["users"]
 contacts_collection: Collection = db["contacts"]
-sos_collection: Collection = db["sos_alerts"]
\ No newline at end of file
+sos_collection: Collection = db["sos_alerts"]
+incidents_collection: Collection = db["incidents"]
+
+# Blocking client for the synchronous route scoring pipeline. connect=False
+# defers its monitor threads so it stays safe to create before forking workers.
+sync_client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=500, connect=False)
+sync_incidents_collection: Collection = sync_client[DATABASE_NAME]["incidents"]
+
+async def ensure_indexes():
+    # 2dsphere index for corridor queries, TTL index so reports expire at expires_at
+    await incidents_collection.create_index([("location", GEOSPHERE)])
+    await incidents_collection.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+    # Per-user rate limit and duplicate checks on /incidents/report
+    await incidents_collection.create_index([("user_email", ASCENDING), ("created_at", ASCENDING)])
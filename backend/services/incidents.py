@@ -0,0 +1,139 @@
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+import polyline
+from services.database import sync_incidents_collection
+from utils.route_format import simplify_polyline
+
+logger = logging.getLogger(__name__)
+
+INCIDENT_TTL_DAYS = 30
+INCIDENT_BATCH_SIZE = 1000
+# Reports within this distance of a route count towards it
+INCIDENT_RADIUS_M = 150
+# Severity-weighted contributor count at which a point's incident score saturates to 1
+INCIDENT_SATURATION = 10.0
+# Maximum reports one user may file per day through /incidents/report
+INCIDENT_DAILY_LIMIT = 10
+# A user's report within this distance of their own earlier report (same
+# category, last day) is treated as a duplicate
+INCIDENT_DEDUP_RADIUS_M = 100
+# Risk added to a point whose incident score is saturated
+INCIDENT_WEIGHT = 0.3
+# Server-side time limit for the per-plan incident query
+INCIDENT_QUERY_MAX_MS = 500
+# After a failed query, skip incident scoring this long instead of stalling every plan
+INCIDENT_RETRY_S = 30
+# Largest batch accepted by /incidents/bulk
+INCIDENT_BULK_MAX = 10000
+
+_skip_until = 0.0
+
+def incident_document(report, user_email, source="user"):
+    """
+    source is "user" for community reports and "bulk" for admin imports;
+    scoring counts each user once per point, but every bulk record separately.
+    """
+    now = datetime.utcnow()
+    days = report.expires_in_days or INCIDENT_TTL_DAYS
+    return {
+        "user_email": user_email,
+        "source": source,
+        "location": {"type": "Point", "coordinates": [report.lng, report.lat]},
+        "category": report.category,
+        "description": report.description,
+        "severity": report.severity,
+        "created_at": now,
+        "expires_at": now + timedelta(days=days),
+    }
+
+def to_meters(lat, lng, lat0):
+    return lng * 111_320 * math.cos(math.radians(lat0)), lat * 110_540
+
+def segment_distance(p, a, b):
+    """Distance in meters from p to segment ab, all in local meters."""
+    (px, py), (ax, ay), (bx, by) = p, a, b
+    dx, dy = bx - ax, by - ay
+    length2 = dx * dx + dy * dy
+    t = 0.0 if length2 == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length2))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+def segment_box(a, b, radius_m=INCIDENT_RADIUS_M):
+    """(south, west, north, east) around segment a-b, padded by radius_m."""
+    lat = (a[0] + b[0]) / 2
+    dlat = radius_m / 110_540
+    dlng = radius_m / (111_320 * max(math.cos(math.radians(lat)), 1e-6))
+    return (min(a[0], b[0]) - dlat, min(a[1], b[1]) - dlng,
+            max(a[0], b[0]) + dlat, max(a[1], b[1]) + dlng)
+
+def get_incident_scores(route_polylines, route_keys, points_by_key):
+    """
+    Severity-weighted incident score in [0, 1] for each scored point.
+
+    Each route's corridor is its polyline (simplified to half the radius)
+    buffered by INCIDENT_RADIUS_M, covered by one box per segment. All
+    corridors are fetched with a single $geoWithin query on the 2dsphere
+    index, so the cost depends on the reports along the routes, not on the
+    total number of reports. A report inside a route's corridor is attributed
+    to that route's nearest sampled point, and each user counts once per
+    point (their most severe report), so one account cannot saturate a point.
+    Returns {key: score}; empty while the database is unreachable.
+    """
+    global _skip_until
+    if not points_by_key or time.monotonic() < _skip_until:
+        return {}
+
+    lat0 = next(iter(points_by_key.values()))[0]
+    corridors = []
+    boxes = []
+    for encoded, keys in zip(route_polylines, route_keys):
+        coords = polyline.decode(simplify_polyline(encoded, INCIDENT_RADIUS_M / 2))
+        if len(coords) == 1:
+            coords = coords * 2
+        segments = list(zip(coords, coords[1:]))
+        boxes.extend(segment_box(a, b) for a, b in segments)
+        corridors.append((
+            [(to_meters(*a, lat0), to_meters(*b, lat0)) for a, b in segments],
+            [(k, to_meters(*points_by_key[k], lat0)) for k in dict.fromkeys(keys)],
+        ))
+    if not boxes:
+        return {}
+
+    query = {"$or": [
+        {"location": {"$geoWithin": {"$geometry": {
+            "type": "Polygon",
+            "coordinates": [[[w, s], [e, s], [e, n], [w, n], [w, s]]],
+        }}}}
+        for s, w, n, e in boxes
+    ]}
+    projection = {"location.coordinates": 1, "severity": 1, "user_email": 1, "source": 1}
+    try:
+        reports = list(sync_incidents_collection.find(query, projection, max_time_ms=INCIDENT_QUERY_MAX_MS))
+    except Exception:
+        _skip_until = time.monotonic() + INCIDENT_RETRY_S
+        logger.warning("incident query failed, scoring without community reports for %ds", INCIDENT_RETRY_S, exc_info=True)
+        return {}
+
+    # (key, contributor) -> strongest severity from that contributor at that point
+    contributions = {}
+    for report in reports:
+        lng, lat = report["location"]["coordinates"]
+        p = to_meters(lat, lng, lat0)
+        contributor = report["_id"] if report.get("source") == "bulk" else report.get("user_email")
+        severity = report.get("severity", 3)
+        for segments, points in corridors:
+            if not points or min(segment_distance(p, a, b) for a, b in segments) > INCIDENT_RADIUS_M:
+                continue
+            key = min(points, key=lambda kp: math.hypot(p[0] - kp[1][0], p[1] - kp[1][1]))[0]
+            slot = (key, contributor)
+            contributions[slot] = max(contributions.get(slot, 0), severity)
+
+    weights = {}
+    for (key, _), severity in contributions.items():
+        weights[key] = weights.get(key, 0.0) + severity / 3.0
+    return {k: min(1.0, weights.get(k, 0.0) / INCIDENT_SATURATION) for k in points_by_key}
+
+def combine_risk(cluster_risk, incident_score):
+    """Reports only ever raise a point's cluster risk; no reports leaves it unchanged."""
+    return min(1.0, cluster_risk + INCIDENT_WEIGHT * incident_score)
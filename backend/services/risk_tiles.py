@@ -0,0 +1,159 @@
+"""
+Raster heatmap tiles (Web Mercator, 256px PNG) of crime risk from the
+cluster model, with a disk cache shared by all workers.
+
+Low zoom levels are pre-rendered offline:
+    python -m services.risk_tiles --max-zoom 12
+Higher zoom levels are rendered on first request and cached on disk.
+"""
+import argparse
+import math
+import os
+import threading
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from crime_model.crime import kmeans, kmeans_lock, cluster_risk
+from utils.model_version import CRIME_MODEL_VERSION
+
+TILE_SIZE = 256
+GRID = 64  # risk samples per tile side, upscaled to TILE_SIZE
+MAX_ZOOM = 18
+PRERENDER_MAX_ZOOM = int(os.getenv("RISK_TILE_PRERENDER_MAX_ZOOM", 12))
+# Points farther than this (degrees) from every cluster centre have no data
+MAX_CENTER_DIST_DEG = 0.03
+TILE_ALPHA = 140
+# Bump whenever rendering changes (GRID, TILE_ALPHA, MAX_CENTER_DIST_DEG,
+# risk_color, ...) so cached tiles on disk and in CDNs are replaced
+TILE_STYLE_VERSION = 1
+# Tiles draw only the crime model, so lighting model changes keep them valid
+TILE_VERSION = f"{CRIME_MODEL_VERSION}-s{TILE_STYLE_VERSION}"
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TILE_CACHE_DIR = os.getenv("RISK_TILE_CACHE_DIR", os.path.join(BACKEND_DIR, "tile_cache"))
+
+_risks = np.array(list(cluster_risk.values()), dtype=float)
+RISK_MIN, RISK_MAX = float(_risks.min()), float(_risks.max())
+
+def tile_etag(z, x, y):
+    # Tiles only change with the crime model or the style, so the version identifies the content
+    return f'"{TILE_VERSION}-{z}-{x}-{y}"'
+
+def tile_path(z, x, y):
+    return os.path.join(TILE_CACHE_DIR, TILE_VERSION, str(z), str(x), f"{y}.png")
+
+def tile_bounds(z, x, y):
+    """(north, west, south, east) of a Web Mercator tile in degrees."""
+    n = 2 ** z
+    def lat(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+    return lat(y), x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0
+
+def data_bounds():
+    """Bounding box of the cluster centres, padded by MAX_CENTER_DIST_DEG."""
+    centers = kmeans.cluster_centers_
+    return (
+        centers[:, 0].max() + MAX_CENTER_DIST_DEG, centers[:, 1].min() - MAX_CENTER_DIST_DEG,
+        centers[:, 0].min() - MAX_CENTER_DIST_DEG, centers[:, 1].max() + MAX_CENTER_DIST_DEG,
+    )
+
+def risk_color(norm):
+    """Green (low) to yellow to red (high) for normalized risk arrays."""
+    r = np.clip(norm * 2, 0, 1)
+    g = np.clip((1 - norm) * 2, 0, 1)
+    return (np.stack([r, g, np.zeros_like(norm)], axis=-1) * 255).astype(np.uint8)
+
+def render_tile(z, x, y):
+    """Render one tile to PNG bytes; areas without crime data stay transparent."""
+    n = 2 ** z
+    offsets = (np.arange(GRID) + 0.5) / GRID
+    lngs = (x + offsets) / n * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + offsets) / n))))
+    lat_grid, lng_grid = np.meshgrid(lats, lngs, indexing="ij")
+
+    rgba = np.zeros((GRID, GRID, 4), dtype=np.uint8)
+    north, west, south, east = data_bounds()
+    inside = (lat_grid <= north) & (lat_grid >= south) & (lng_grid >= west) & (lng_grid <= east)
+    if inside.any():
+        points = pd.DataFrame(
+            np.column_stack([lat_grid[inside], lng_grid[inside]]), columns=['latitude', 'longitude']
+        )
+        with kmeans_lock:
+            distances = kmeans.transform(points)
+        cids = distances.argmin(axis=1)
+        has_data = distances.min(axis=1) <= MAX_CENTER_DIST_DEG
+        risks = np.array([cluster_risk.get(c, 0) for c in cids], dtype=float)
+        norm = (risks - RISK_MIN) / (RISK_MAX - RISK_MIN) if RISK_MAX > RISK_MIN else np.zeros_like(risks)
+        colors = np.zeros((len(cids), 4), dtype=np.uint8)
+        colors[:, :3] = risk_color(norm)
+        colors[:, 3] = np.where(has_data, TILE_ALPHA, 0)
+        rgba[inside] = colors
+
+    image = Image.fromarray(rgba, "RGBA").resize((TILE_SIZE, TILE_SIZE), Image.NEAREST)
+    buf = BytesIO()
+    image.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+def empty_tile():
+    buf = BytesIO()
+    Image.new("RGBA", (TILE_SIZE, TILE_SIZE), (0, 0, 0, 0)).save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+EMPTY_TILE = empty_tile()
+
+def tile_has_data(z, x, y):
+    north, west, south, east = tile_bounds(z, x, y)
+    d_north, d_west, d_south, d_east = data_bounds()
+    return south <= d_north and north >= d_south and west <= d_east and east >= d_west
+
+def get_tile(z, x, y):
+    """
+    Return PNG bytes for a tile from the disk cache, rendering it if missing.
+    Tiles outside the crime data share one in-memory transparent PNG and are
+    never written to disk, so arbitrary requests cannot fill the cache.
+    """
+    if not tile_has_data(z, x, y):
+        return EMPTY_TILE
+    path = tile_path(z, x, y)
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+    data = render_tile(z, x, y)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)  # atomic so concurrent workers never see partial tiles
+    return data
+
+def tiles_covering(bounds, z):
+    north, west, south, east = bounds
+    n = 2 ** z
+    def tx(lng):
+        return int((lng + 180.0) / 360.0 * n)
+    def ty(lat):
+        lat_r = math.radians(lat)
+        return int((1 - math.asinh(math.tan(lat_r)) / math.pi) / 2 * n)
+    for x in range(max(tx(west), 0), min(tx(east), n - 1) + 1):
+        for y in range(max(ty(north), 0), min(ty(south), n - 1) + 1):
+            yield x, y
+
+def prerender(min_zoom=0, max_zoom=PRERENDER_MAX_ZOOM):
+    """Render every tile covering the crime data for the given zoom range."""
+    bounds = data_bounds()
+    count = 0
+    for z in range(min_zoom, max_zoom + 1):
+        for x, y in tiles_covering(bounds, z):
+            get_tile(z, x, y)
+            count += 1
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render low zoom risk tiles to the disk cache")
+    parser.add_argument("--min-zoom", type=int, default=0)
+    parser.add_argument("--max-zoom", type=int, default=PRERENDER_MAX_ZOOM)
+    args = parser.parse_args()
+    print(f"Rendered {prerender(args.min_zoom, args.max_zoom)} tiles into {TILE_CACHE_DIR}")
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from utils.model_version import ROUTE_MODEL_VERSION
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional, only needed for the shared backend
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+ROUTE_CACHE_SIZE = int(os.getenv("ROUTE_CACHE_SIZE", 1024))
+ROUTE_CACHE_FRESH_S = int(os.getenv("ROUTE_CACHE_FRESH_S", 300))
+ROUTE_CACHE_STALE_S = int(os.getenv("ROUTE_CACHE_STALE_S", 1800))
+ROUTE_CACHE_TIME_BUCKET_S = int(os.getenv("ROUTE_CACHE_TIME_BUCKET_S", 3600))
+ROUTE_CACHE_GRID_DEG = float(os.getenv("ROUTE_CACHE_GRID_DEG", 0.002))  # ~200 m
+ROUTE_CACHE_REDIS_URL = os.getenv("ROUTE_CACHE_REDIS_URL")
+
+def snap(coord):
+    lat, lng = coord
+    return (round(lat / ROUTE_CACHE_GRID_DEG) * ROUTE_CACHE_GRID_DEG,
+            round(lng / ROUTE_CACHE_GRID_DEG) * ROUTE_CACHE_GRID_DEG)
+
+def route_cache_key(src, dst, mode, now=None):
+    """Cache key from grid-snapped origin/destination, travel mode, time bucket and model version."""
+    now = time.time() if now is None else now
+    (slat, slng), (dlat, dlng) = snap(src), snap(dst)
+    bucket = int(now // ROUTE_CACHE_TIME_BUCKET_S)
+    return f"route:{ROUTE_MODEL_VERSION}:{mode}:{bucket}:{slat:.4f},{slng:.4f}:{dlat:.4f},{dlng:.4f}"
+
+class LRUBackend:
+    """In-process LRU, private to each worker."""
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    async def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    async def set(self, key, entry, ttl):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+class RedisBackend:
+    """Shared backend so several workers reuse each other's entries."""
+    def __init__(self, url):
+        self.client = aioredis.from_url(url)
+
+    async def get(self, key):
+        raw = await self.client.get(key)
+        return json.loads(raw) if raw else None
+
+    async def set(self, key, entry, ttl):
+        await self.client.set(key, json.dumps(entry), ex=ttl)
+
+class RouteCache:
+    """
+    Stale-while-revalidate cache for route-plan results. Entries younger than
+    fresh_s are served as hits; entries up to stale_s old are served
+    immediately while a single background refresh recomputes them.
+    """
+    def __init__(self, local, shared=None, fresh_s=ROUTE_CACHE_FRESH_S, stale_s=ROUTE_CACHE_STALE_S):
+        self.local = local
+        self.shared = shared
+        self.fresh_s = fresh_s
+        self.stale_s = stale_s
+        # key -> task computing and storing that key, shared by concurrent
+        # misses and the background refresh (single-flight)
+        self.inflight = {}
+
+    async def get(self, key):
+        entry = await self.local.get(key)
+        if entry is None and self.shared is not None:
+            try:
+                entry = await self.shared.get(key)
+            except Exception:
+                logger.warning("shared route cache read failed for %s", key, exc_info=True)
+                entry = None
+            if entry is not None:
+                await self.local.set(key, entry, self.stale_s)
+        if entry is None:
+            return None
+        age = time.time() - entry["created_at"]
+        if age > self.stale_s:
+            return None
+        return entry["value"], age
+
+    async def set(self, key, value):
+        entry = {"created_at": time.time(), "value": value}
+        await self.local.set(key, entry, self.stale_s)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, entry, self.stale_s)
+            except Exception:
+                logger.warning("shared route cache write failed for %s", key, exc_info=True)
+
+    async def get_or_compute(self, key, compute):
+        """
+        Return (value, age_seconds, status) where status is HIT, STALE or MISS.
+        compute is a blocking callable run in a worker thread, so the event
+        loop is never blocked; the models serialize their own inference.
+        Concurrent misses and refreshes for one key share a single compute.
+        """
+        cached = await self.get(key)
+        if cached is not None:
+            value, age = cached
+            if age <= self.fresh_s:
+                return value, age, "HIT"
+            self._start(key, compute)
+            return value, age, "STALE"
+        value = await asyncio.shield(self._start(key, compute))
+        return value, 0.0, "MISS"
+
+    def _start(self, key, compute):
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute_and_store(key, compute))
+            self.inflight[key] = task
+            task.add_done_callback(lambda t: self._finished(key, t))
+        return task
+
+    def _finished(self, key, task):
+        self.inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            # Misses re-raise it to their callers; a failed refresh keeps
+            # serving the stale entry until it expires
+            logger.error("route computation failed", exc_info=task.exception())
+
+    async def _compute_and_store(self, key, compute):
+        value = await asyncio.to_thread(compute)
+        await self.set(key, value)
+        return value
+
+shared_backend = None
+if ROUTE_CACHE_REDIS_URL and aioredis is not None:
+    shared_backend = RedisBackend(ROUTE_CACHE_REDIS_URL)
+
+route_cache = RouteCache(LRUBackend(ROUTE_CACHE_SIZE), shared_backend)
@@ -1,4 +1,5 @@
 import os
+import threading
 from dotenv import load_dotenv
 import requests
 import polyline
@@ -10,6 +11,8 @@ from ultralytics import YOLO
 # Load your trained YOLO model
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 model = YOLO(os.path.join(BASE_DIR, "best.pt")) 
+# YOLO predictors are not thread-safe and route plans score in worker threads
+model_lock = threading.Lock()
 
 load_dotenv()
 # Google Maps API key
@@ -40,25 +43,20 @@ def get_streetview_image(lat, lng, heading=0, pitch=0, fov=90):
         return Image.open(BytesIO(response.content))
     return None
 
-def get_lighting_score_for_points(points):
-    well_lit_points = 0
-    total_points = 0
-    for lat, lng in points:
-        lamps_found = 0
-        for heading in [0, 90, 180, 270]:
-            img = get_streetview_image(lat, lng, heading=heading)
-            if img and detect_lamps(img) > 0:
-                lamps_found += 1
-                break
-        if lamps_found > 0:
-            well_lit_points += 1
-        total_points += 1
-    if total_points == 0:
-        return 0.0
-    return well_lit_points / total_points
+def is_point_well_lit(lat, lng):
+    """
+    True if a street lamp is detected in any Street View heading at the point.
+    Stops downloading images at the first heading with a detection.
+    """
+    for heading in [0, 90, 180, 270]:
+        img = get_streetview_image(lat, lng, heading=heading)
+        if img and detect_lamps(img) > 0:
+            return True
+    return False
 
 def detect_lamps(image):
-    results = model(image)
+    with model_lock:
+        results = model(image)
     return len(results[0].boxes)  # Number of detections
 
 def get_lighting_score(src_addr, dst_addr, polyline_str=None):
@@ -0,0 +1,54 @@
+import os
+
+def process_memory(pid: int):
+    """
+    Read the memory breakdown of a process from /proc.
+    Returns a dict with rss, pss, unique (private) and shared sizes in bytes,
+    or None when the process is gone or /proc is not available (non-Linux).
+    """
+    fields = {}
+    for name in ("smaps_rollup", "smaps"):
+        path = f"/proc/{pid}/{name}"
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path) as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 3 and parts[2] == "kB":
+                        key = parts[0].rstrip(":")
+                        fields[key] = fields.get(key, 0) + int(parts[1]) * 1024
+        except OSError:
+            return None
+        break
+    if not fields:
+        return None
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "unique": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+def format_memory_report(master_pid: int, worker_pids):
+    """
+    Build a human readable report of unique vs shared memory for the master
+    and each worker process.
+    """
+    def mb(n):
+        return f"{n / (1024 * 1024):.1f} MB"
+
+    lines = []
+    total_unique = 0
+    for label, pid in [("master", master_pid)] + [("worker", p) for p in worker_pids]:
+        mem = process_memory(pid)
+        if mem is None:
+            lines.append(f"{label} {pid}: memory info unavailable")
+            continue
+        total_unique += mem["unique"]
+        lines.append(
+            f"{label} {pid}: unique={mb(mem['unique'])} shared={mb(mem['shared'])} "
+            f"pss={mb(mem['pss'])} rss={mb(mem['rss'])}"
+        )
+    lines.append(f"total unique across processes: {mb(total_unique)}")
+    return "\n".join(lines)
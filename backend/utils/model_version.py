@@ -0,0 +1,34 @@
+import hashlib
+import os
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CRIME_MODEL_FILES = [
+    os.path.join(BACKEND_DIR, "crime_model", "kmeans_model.pkl"),
+    os.path.join(BACKEND_DIR, "crime_model", "cluster_risk_lookup.pkl"),
+    os.path.join(BACKEND_DIR, "crime_model", "risk_scaler.pkl"),
+]
+LIGHTING_MODEL_FILES = [
+    os.path.join(BACKEND_DIR, "streetlight_model", "best.pt"),
+]
+
+def model_version(paths):
+    """
+    Short fingerprint of model files, used to key caches of model output so
+    entries computed with an older model are never served. Hashes file
+    contents, so pods with the same models agree regardless of when their
+    files were checked out.
+    """
+    h = hashlib.sha1()
+    for path in paths:
+        h.update(os.path.basename(path).encode())
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+        except OSError:
+            h.update(b"missing")
+    return h.hexdigest()[:12]
+
+CRIME_MODEL_VERSION = model_version(CRIME_MODEL_FILES)
+# Route scores depend on both the crime and the lighting models
+ROUTE_MODEL_VERSION = model_version(CRIME_MODEL_FILES + LIGHTING_MODEL_FILES)
@@ -0,0 +1,119 @@
+import gzip
+import json
+import math
+import brotli
+import msgpack
+import polyline
+from fastapi import Request, Response
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+MIN_COMPRESS_BYTES = 512
+
+def coalesce_hotspots(hotspots):
+    """
+    Merge hotspots on consecutive points that fall in the same cluster into
+    spans. Each span keeps its start/end coordinates, the peak risk and how
+    many sampled points it covers.
+    """
+    spans = []
+    for h in hotspots:
+        last = spans[-1] if spans else None
+        if last and last["cid"] == h["cid"] and last["end_idx"] == h.get("idx", -2) - 1:
+            last["end"] = [h["lat"], h["lng"]]
+            last["end_idx"] = h["idx"]
+            last["risk"] = max(last["risk"], round(h["risk"], 4))
+            last["n"] += 1
+        else:
+            spans.append({
+                "cid": h["cid"],
+                "risk": round(h["risk"], 4),
+                "start": [h["lat"], h["lng"]],
+                "end": [h["lat"], h["lng"]],
+                "end_idx": h.get("idx", -2),
+                "n": 1,
+            })
+    for s in spans:
+        del s["end_idx"]
+    return spans
+
+def simplify_polyline(encoded, tolerance_m):
+    """
+    Douglas-Peucker simplification of an encoded polyline. tolerance_m is the
+    maximum allowed deviation in meters; 0 returns the polyline unchanged.
+    """
+    if not tolerance_m or tolerance_m <= 0:
+        return encoded
+    coords = polyline.decode(encoded)
+    if len(coords) < 3:
+        return encoded
+
+    # Local equirectangular projection to meters, fine at route scale
+    lat0 = math.radians(coords[0][0])
+    xy = [(lng * 111_320 * math.cos(lat0), lat * 110_540) for lat, lng in coords]
+
+    keep = [False] * len(coords)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(coords) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = xy[first], xy[last]
+        dx, dy = x2 - x1, y2 - y1
+        seg_len = math.hypot(dx, dy)
+        max_dist, index = 0.0, first
+        for i in range(first + 1, last):
+            px, py = xy[i]
+            if seg_len == 0:
+                dist = math.hypot(px - x1, py - y1)
+            else:
+                dist = abs(dy * px - dx * py + x2 * y1 - y2 * x1) / seg_len
+            if dist > max_dist:
+                max_dist, index = dist, i
+        if max_dist > tolerance_m:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return polyline.encode([c for c, k in zip(coords, keep) if k])
+
+def accepted(header):
+    """
+    Values listed in an Accept or Accept-Encoding header, lowercased,
+    leaving out those the client refuses with q=0.
+    """
+    values = set()
+    for item in header.split(","):
+        value, *params = [p.strip() for p in item.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, raw = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(raw)
+                except ValueError:
+                    q = 0.0
+        if value and q > 0:
+            values.add(value.lower())
+    return values
+
+def negotiated_response(payload, request: Request) -> Response:
+    """
+    Serialize payload as MessagePack when the client accepts it, otherwise
+    JSON, then compress with brotli or gzip based on Accept-Encoding.
+    """
+    accepted_types = accepted(request.headers.get("accept", ""))
+    if any(t in accepted_types for t in MSGPACK_MEDIA_TYPES):
+        body = msgpack.packb(payload, use_bin_type=True)
+        media_type = "application/msgpack"
+    else:
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        media_type = "application/json"
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    encodings = accepted(request.headers.get("accept-encoding", ""))
+    if len(body) >= MIN_COMPRESS_BYTES:
+        if "br" in encodings:
+            body = brotli.compress(body)
+            headers["Content-Encoding"] = "br"
+        elif "gzip" in encodings:
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=media_type, headers=headers)